@@ -1 +1,2 @@
-from .nbapr import sim, pr_traditional
\ No newline at end of file
+from .nbapr import sim, sim_many, compare_players, pr_traditional, pr_traditional_sweep
+from .pool import PlayerPool
\ No newline at end of file
@@ -3,13 +3,20 @@
 # Copyright (C) 2021 Eric Truett
 # Licensed under the MIT License
 
+from __future__ import annotations
+
 import logging
 import time
-from typing import Iterable, Union
+from typing import TYPE_CHECKING, Dict, Iterable, List, Union
 import warnings
 
 import numpy as np
-import pandas as pd
+
+from .pool import ID_COLS, PlayerPool
+
+# pandas is only needed to build result frames, so import it when used
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 logging.getLogger(__name__).addHandler(logging.NullHandler())
@@ -30,11 +37,56 @@ def _timeit(method):
     return timed
 
 
+SAMPLING_METHODS = ('random', 'stratified')
+
+
+def _rng(seed=None):
+    """Gets random number source
+
+    Args:
+        seed (Union[None, int, np.random.Generator]): None uses the global numpy state,
+            otherwise passed to np.random.default_rng. The same seed gives the same draws,
+            but draws line up by row, not by player, so separate sims only share common
+            random numbers if their pools have the same row order. Use sim_many(crn=True)
+            or compare_players to compare pools or players.
+
+    Returns:
+        np.random module or np.random.Generator
+
+    """
+    return np.random if seed is None else np.random.default_rng(seed)
+
+
+def _uniforms(shape: tuple, method: str = 'random', rng=np.random) -> np.ndarray:
+    """Draws uniforms for sampling, stratified along the samples axis (-2)
+
+    Args:
+        shape (tuple): shape of (..., num_samples, n_elements)
+        method (str): 'random' for independent uniforms, 
+                      'stratified' for a latin hypercube across samples for each element
+        rng: random number source from _rng
+
+    Returns:
+        np.ndarray of shape
+
+    """
+    if method == 'random':
+        return rng.random(shape)
+    num_samples = shape[-2]
+    if method == 'stratified':
+        # each element gets exactly one draw from each of num_samples equal strata
+        strata = rng.random(shape).argsort(axis=-2)
+        return (strata + rng.random(shape)) / num_samples
+    raise ValueError(f'unknown sampling method "{method}", must be one of {SAMPLING_METHODS}')
+
+
 @_timeit
 def _multidimensional_shifting(elements: Iterable, 
                                num_samples: int, 
                                sample_size: int, 
-                               probs: Iterable) -> np.ndarray:
+                               probs: Iterable,
+                               method: str = 'random',
+                               rng=np.random) -> np.ndarray:
     """Based on https://medium.com/ibm-watson/incredibly-fast-random-sampling-in-python-baf154bd836a
     
     Args:
@@ -42,13 +94,15 @@ def _multidimensional_shifting(elements: Iterable,
         num_samples (int): the number of rows (e.g. initial population size)
         sample_size (int): the number of columns (e.g. team size)
         probs (iterable): is same size as elements
+        method (str): 'random' or 'stratified', see _uniforms
+        rng: random number source from _rng
 
     Returns:
         ndarray: of shape (num_samples, sample_size)
         
     """
     replicated_probabilities = np.tile(probs, (num_samples, 1))
-    random_shifts = np.random.random(replicated_probabilities.shape)
+    random_shifts = _uniforms(replicated_probabilities.shape, method, rng)
     random_shifts /= random_shifts.sum(axis=1)[:, np.newaxis]
     shifted_probabilities = random_shifts - replicated_probabilities
     samples = np.argpartition(shifted_probabilities, sample_size, axis=1)[:, :sample_size]
@@ -117,7 +171,7 @@ def rankdata(a: np.ndarray, method: str = 'average', *, axis: Union[None, int] =
 
 @_timeit
 def _create_player_points(
-        pool: pd.DataFrame, 
+        pool: Union[PlayerPool, pd.DataFrame], 
         teams: np.ndarray,
         n_iterations: int,
         n_teams: int,
@@ -127,17 +181,20 @@ def _create_player_points(
     """Calculates playerpoints
        
     Args:
-        pool (pd.DataFrame): the player pool
-        statscols (Iterable[str]): the statistics columns
-        teams (np.ndarray): the teams
+        pool (Union[PlayerPool, pd.DataFrame]): the player pool
+        teams (np.ndarray): the teams, as positions in the pool
+        n_iterations (int): number of leagues
+        n_teams (int): number of teams per league
+        n_players (int): number of players per team
+        team_points (np.ndarray): the team points, shape (n_iterations, n_teams)
 
     Returns:
         np.ndarray
         
     """
-
     # now need to link back to players
-    players = pool.index.values
+    # players are positions in the pool, so can index directly
+    n_pool = len(pool)
 
     # once we've calculated stats, can remove league dimension from teams
     # is just a 2D array of teams
@@ -145,27 +202,36 @@ def _create_player_points(
     teams2d = teams.reshape(n_iterations * n_teams, n_players)
     team_points1d = team_points.ravel()
 
-    # creates array of shape (len(teams2d), len(players))
-    # is effectively one hot encoder for player indexes
-    # if player index 3 is on team 0, then on_team[0, 3] == 1
-    on_team = (players[...,None]==teams2d[:,None,:]).any(-1).astype(int)
-
-    # now we can calculate player points by multiplying
-    # matrix of zeroes and ones with team points
-    return on_team * team_points1d[:, np.newaxis]
+    # creates array of shape (len(teams2d), n_pool)
+    # if player 3 is on team 0, then player_points[0, 3] == team_points1d[0]
+    # a player appears at most once per league, so scattering is safe
+    player_points = np.zeros((len(teams2d), n_pool), dtype=np.float64)
+    rows = np.arange(len(teams2d))[:, np.newaxis]
+    player_points[rows, teams2d] = team_points1d[:, np.newaxis]
+    return player_points
 
 
 @_timeit
 def _create_teams(
-        pool: pd.DataFrame, 
+        pool: Union[PlayerPool, pd.DataFrame], 
         n_iterations: int = 500, 
         n_teams: int = 10, 
         n_players: int = 10,
-        probcol: str = 'probs'
+        probcol: str = 'probs',
+        method: str = 'random',
+        rng=np.random
     ) -> np.ndarray:
     """Creates initial set of teams
     
-    
+    Args:
+        pool (Union[PlayerPool, pd.DataFrame]): the player pool
+        n_iterations (int): number of leagues to simulate, default 500
+        n_teams (int): number of teams per league, default 10
+        n_players (int): number of player per team, default 10
+        probcol (str): the column name with probabilities, only used for dataframes
+        method (str): 'random' or 'stratified', see _uniforms
+        rng: random number source from _rng
+
     Returns:
         np.ndarray of shape
           axis 0 - number of iterations
@@ -176,11 +242,16 @@ def _create_teams(
     # axis 0 = number of iterations (leagues)
     # axis 1 = number of teams in league
     # axis 2 = number of players on team   
+    # elements are positions in the pool, not dataframe labels
+    if not isinstance(pool, PlayerPool):
+        pool = PlayerPool.from_frame(pool, probcol=probcol)
     arr = _multidimensional_shifting(
-        elements=pool.index.values, 
+        elements=pool.index, 
         num_samples=n_iterations, 
         sample_size=n_teams * n_players, 
-        probs=pool[probcol]
+        probs=pool.probs,
+        method=method,
+        rng=rng
     )
 
     return arr.reshape(n_iterations, n_teams, n_players)
@@ -188,23 +259,26 @@ def _create_teams(
 
 @_timeit
 def _create_teamstats(
-        pool: pd.DataFrame, 
+        pool: Union[PlayerPool, pd.DataFrame], 
         statscols: Iterable[str],
         teams: np.ndarray
     ) -> np.ndarray:
     """Calculates team statistics
        
     Args:
-        pool (pd.DataFrame): the player pool
+        pool (Union[PlayerPool, pd.DataFrame]): the player pool
         statscols (Iterable[str]): the statistics columns
-        teams (np.ndarray): the teams
+        teams (np.ndarray): the teams, as positions in the pool
 
     Returns:
         np.ndarray
         
     """
     # get the player stats as a 2D array
-    stats_mda = pool.loc[:, statscols].values
+    if isinstance(pool, PlayerPool):
+        stats_mda = pool.columns(statscols)
+    else:
+        stats_mda = pool.loc[:, list(statscols)].to_numpy(dtype=np.float64)
 
     # now get the team stats
     # has shape (n_iterations, n_teams, n_players, len(statcols))
@@ -254,6 +328,8 @@ def pr_traditional(pool: pd.DataFrame,
            player[str], pts[float]
 
     """
+    import pandas as pd
+
     pool = pool.dropna()
     stats = pool.loc[:, statscols].values
     pts = np.sum(_zscore(stats), axis=1)
@@ -267,34 +343,138 @@ def pr_traditional(pool: pd.DataFrame,
     })
 
 
+def pr_traditional_sweep(pool: pd.DataFrame, 
+        cutoffs: Dict[str, Iterable[float]] = None,
+        top_n: Dict[str, Iterable[int]] = None,
+        statscols: Iterable[str] = ('WFGP', 'FTM', 'FG3M', 'REB', 'AST', 'STL', 'BLK', 'TOV', 'PTS'),
+        ) -> pd.DataFrame:
+    """Traditional player rater for many player pool cutoffs in one pass
+
+    Rows with missing values are dropped first, as pr_traditional does, and then every
+    cutoff is applied to the remaining rows. So each column equals pr_traditional on
+    complete[complete[col] >= cutoff], or on complete.nlargest(n, col), where
+    complete = pool.dropna(). Top n therefore means the top n complete rows; this can
+    differ from pr_traditional(pool.nlargest(n, col)), which drops after ranking.
+    The pool is sorted once per column and means and variances for every cutoff
+    come from cumulative sums.
+
+    Args:
+        pool (pd.DataFrame): the player pool dataframe
+        cutoffs (Dict[str, Iterable[float]]): minimum values by column, e.g. {'MIN': [0, 500, 1500]}
+        top_n (Dict[str, Iterable[int]]): pool sizes by ranking column, e.g. {'NBA_FANTASY_PTS': [150]}
+        statscols (Iterable[str]): the stats columns
+
+    Returns:
+        pd.DataFrame with columns
+           player[str], pos[str], team[str], 
+           pr_zscore_{col}_{cutoff}[float] and pr_zscore_top{n}_{col}[float],
+           NaN for players outside that pool
+
+    """
+    import pandas as pd
+
+    pool = pool.dropna()
+    stats = pool.loc[:, list(statscols)].to_numpy(dtype=np.float64)
+
+    # center on overall mean so cumulative sums of squares keep their precision
+    centered = stats - stats.mean(axis=0)
+    specs = {}
+    for col, values in (cutoffs or {}).items():
+        specs[col] = specs.get(col, []) + [(f'pr_zscore_{col}_{v}', 'cutoff', v) for v in values]
+    for col, values in (top_n or {}).items():
+        specs[col] = specs.get(col, []) + [(f'pr_zscore_top{n}_{col}', 'top_n', n) for n in values]
+
+    results = {}
+    for col, spec in specs.items():
+        # sort once by the cutoff variable, so every pool is a prefix of the sorted rows
+        by = pool[col].to_numpy()
+        order = np.argsort(-by, kind='stable')
+        x = centered[order]
+        cs = np.cumsum(x, axis=0)
+        cs2 = np.cumsum(x * x, axis=0)
+        cmax = np.maximum.accumulate(x, axis=0)
+        cmin = np.minimum.accumulate(x, axis=0)
+
+        # number of players in each pool
+        sizes = np.array([
+            np.searchsorted(-by[order], -v, side='right') if kind == 'cutoff' else min(v, len(x))
+            for _, kind, v in spec
+        ], dtype=int)
+        last = np.maximum(sizes - 1, 0)
+        mean = cs[last] / np.maximum(sizes, 1)[:, np.newaxis]
+        std = np.sqrt(np.maximum(cs2[last] / np.maximum(sizes, 1)[:, np.newaxis] - mean ** 2, 0))
+
+        # constant columns have nan z-scores, as in pr_traditional
+        with np.errstate(divide='ignore'):
+            inv_std = np.where(cmax[last] == cmin[last], np.nan, 1 / std)
+
+        # sum of z-scores is x @ (1 / std) - sum(mean / std) for each pool
+        pts = x @ inv_std.T - np.sum(mean * inv_std, axis=1)
+        pts[np.arange(len(x))[:, np.newaxis] >= sizes] = np.nan
+        for j, (name, _, _) in enumerate(spec):
+            results[name] = np.empty(len(x))
+            results[name][order] = pts[:, j]
+
+    ids = {k: pool[v].values for k, v in ID_COLS.items() if v in pool.columns}
+    return pd.DataFrame({**ids, **results}, index=pool.index)
+
+
+def _results_frame(pool: PlayerPool, **kwargs) -> pd.DataFrame:
+    """Creates results dataframe with the pool's player, pos and team columns
+
+    Args:
+        pool (PlayerPool): the player pool
+        **kwargs: result columns, each aligned with the pool
+
+    Returns:
+        pd.DataFrame
+
+    """
+    import pandas as pd
+    return pd.DataFrame({**pool.ids, **kwargs}, index=pool.labels)
+
+
 @_timeit
-def sim(pool: pd.DataFrame, 
+def sim(pool: Union[PlayerPool, pd.DataFrame], 
         n_iterations: int = 500, 
         n_teams: int = 10, 
         n_players: int = 10,
         statscols: Iterable[str] = ('WFGP', 'FTM', 'FG3M', 'REB', 'AST', 'STL', 'BLK', 'TOV', 'PTS'),
-        probcol: str = 'probs'
-        ) -> pd.DataFrame:
+        probcol: str = 'probs',
+        method: str = 'random',
+        seed: Union[None, int, np.random.Generator] = None,
+        as_frame: bool = True
+        ) -> Union[pd.DataFrame, Dict[str, np.ndarray]]:
     """Simulates NBA fantasy season
     
     Args:
-        pool (pd.DataFrame): the player pool dataframe
+        pool (Union[PlayerPool, pd.DataFrame]): the player pool
         n_iterations (int): number of leagues to simulate, default 500
         n_teams (int): number of teams per league, default 10
         n_players (int): number of player per team, default 10
         statscols (Iterable[str]): the stats columns
         probcol (str): the column name with probabilities for sampling
+        method (str): league sampling, 'random' (default) or 'stratified'
+        seed (Union[None, int, np.random.Generator]): random seed, default global state.
+            Sims with the same seed only share common random numbers if their pools have the
+            same row order; see sim_many(crn=True) and compare_players
+        as_frame (bool): return a dataframe, default True. False returns a dict of arrays
+            aligned with the pool and does not import pandas.
 
     Returns:
-        pd.DataFrame with columns
-           player[str], pts[float]
+        pd.DataFrame (or Dict[str, np.ndarray]) with columns
+           player[str], pos[str], team[str], pts[float]
 
     """
+    # build arrays once rather than in each stage
+    if not isinstance(pool, PlayerPool):
+        pool = PlayerPool.from_frame(pool, statscols, probcol)
+
     # get the teams, which are represented as 3D array
     # axis 0 = number of iterations (leagues)
     # axis 1 = number of teams in league
     # axis 2 = number of players in team
-    teams = _create_teams(pool, n_iterations, n_teams, n_players)
+    teams = _create_teams(pool, n_iterations, n_teams, n_players, method=method, rng=_rng(seed))
     
     # stats_mda is shape(len(players), len(statcols)
     # so each row is a player's stats in those categories
@@ -317,12 +497,250 @@ def sim(pool: pd.DataFrame,
     player_mean = np.nanmean(player_points, axis=0)
 
     # return results
-    return pd.DataFrame({
-        'player': pool.PLAYER_NAME,
-        'pos': pool.POS,
-        'team': pool.TEAM, 
-        'pts': player_mean
-    })
+    if not as_frame:
+        return {**pool.ids, 'pts': player_mean}
+    return _results_frame(pool, pts=player_mean)
+
+
+@_timeit
+def compare_players(pool: Union[PlayerPool, pd.DataFrame],
+                    a,
+                    b,
+                    n_iterations: int = 500, 
+                    n_teams: int = 10, 
+                    n_players: int = 10,
+                    statscols: Iterable[str] = ('WFGP', 'FTM', 'FG3M', 'REB', 'AST', 'STL', 'BLK', 'TOV', 'PTS'),
+                    probcol: str = 'probs',
+                    method: str = 'random',
+                    seed: Union[None, int, np.random.Generator] = None
+                    ) -> dict:
+    """Compares two players with common random numbers
+
+    In every simulated league that has either player, the players are swapped
+    and the league is re-ranked, so both are measured in the same team context.
+    The paired difference is far less noisy than comparing pts from sim.
+
+    Args:
+        pool (Union[PlayerPool, pd.DataFrame]): the player pool
+        a: index label of the first player
+        b: index label of the second player
+        n_iterations (int): number of leagues to simulate, default 500
+        n_teams (int): number of teams per league, default 10
+        n_players (int): number of player per team, default 10
+        statscols (Iterable[str]): the stats columns
+        probcol (str): the column name with probabilities for sampling
+        method (str): league sampling, 'random' (default) or 'stratified'
+        seed (Union[None, int, np.random.Generator]): random seed, default global state
+
+    Returns:
+        dict with keys diff[float] (points a adds over b), se[float], n_leagues[int]
+
+    """
+    if not isinstance(pool, PlayerPool):
+        pool = PlayerPool.from_frame(pool, statscols, probcol)
+    positions = []
+    for x in (a, b):
+        match = np.flatnonzero(pool.labels == x)
+        if not len(match):
+            raise KeyError(f'{x} not in pool')
+        positions.append(int(match[0]))
+    pos_a, pos_b = positions
+    stats = pool.columns(statscols)
+    teams = _create_teams(pool, n_iterations, n_teams, n_players, method=method, rng=_rng(seed))
+    team_stats_totals = stats[teams].sum(axis=2)
+    team_points = _rank_average(team_stats_totals, axis=1).sum(axis=2)
+
+    # team of each player in each league, only meaningful where has_ is True
+    on_a, on_b = (teams == pos_a).any(axis=2), (teams == pos_b).any(axis=2)
+    has_a, has_b = on_a.any(axis=1), on_b.any(axis=1)
+    leagues = np.arange(n_iterations)
+    team_a, team_b = on_a.argmax(axis=1), on_b.argmax(axis=1)
+
+    # swap a for b (and b for a) and re-rank the same leagues
+    d = stats[pos_b] - stats[pos_a]
+    swapped = team_stats_totals.copy()
+    swapped[leagues[has_a], team_a[has_a]] += d
+    swapped[leagues[has_b], team_b[has_b]] -= d
+    swapped_points = _rank_average(swapped, axis=1).sum(axis=2)
+
+    # points with a minus points with b, from the team(s) that had either player
+    diff_a = team_points[leagues, team_a] - swapped_points[leagues, team_a]
+    diff_b = swapped_points[leagues, team_b] - team_points[leagues, team_b]
+    diff = np.where(has_a & has_b, (diff_a + diff_b) / 2, np.where(has_a, diff_a, diff_b))[has_a | has_b]
+    return {
+        'diff': diff.mean() if len(diff) else np.nan,
+        'se': diff.std(ddof=1) / np.sqrt(len(diff)) if len(diff) > 1 else np.nan,
+        'n_leagues': len(diff)
+    }
+
+
+def _stack_pools(pools: List[PlayerPool], statscols: Iterable[str]) -> tuple:
+    """Stacks pools along a leading pool axis, padding to the largest pool
+
+    Args:
+        pools (List[PlayerPool]): the player pools
+        statscols (Iterable[str]): the statistics columns
+
+    Returns:
+        tuple of np.ndarray
+          stats of shape (n_pools, n_max, len(statscols))
+          probs of shape (n_pools, n_max)
+          valid of shape (n_pools, n_max), False for padding
+
+    """
+    statscols = tuple(statscols)
+    n_max = max(len(pool) for pool in pools)
+    stats = np.zeros((len(pools), n_max, len(statscols)), dtype=np.float64)
+    probs = np.zeros((len(pools), n_max), dtype=np.float64)
+    valid = np.zeros((len(pools), n_max), dtype=bool)
+    for i, pool in enumerate(pools):
+        n = len(pool)
+        stats[i, :n] = pool.columns(statscols)
+        probs[i, :n] = pool.probs
+        valid[i, :n] = True
+    return stats, probs, valid
+
+
+@_timeit
+def _stacked_shifting(probs: np.ndarray,
+                      valid: np.ndarray,
+                      num_samples: int,
+                      sample_size: int,
+                      method: str = 'random',
+                      rng=np.random,
+                      players: np.ndarray = None) -> np.ndarray:
+    """Multidimensional shifting for stacked pools
+
+    Args:
+        probs (np.ndarray): probabilities of shape (n_pools, n_max)
+        valid (np.ndarray): mask of shape (n_pools, n_max), False for padding
+        num_samples (int): the number of rows (e.g. number of leagues)
+        sample_size (int): the number of columns (e.g. players per league)
+        method (str): 'random' or 'stratified', see _uniforms
+        rng: random number source from _rng
+        players (np.ndarray): optional player ids of shape (n_pools, n_max), numbered 0..n_shared - 1.
+            If given, uniforms are drawn once per player and shared by every pool with that player.
+
+    Returns:
+        ndarray: positions of shape (n_pools, num_samples, sample_size)
+
+    """
+    # same algorithm as _multidimensional_shifting with a leading pool axis
+    # padding is excluded from the normalization and can never be selected
+    if players is None:
+        random_shifts = _uniforms((probs.shape[0], num_samples, probs.shape[1]), method, rng)
+    else:
+        shared = _uniforms((num_samples, players.max() + 1), method, rng)
+        random_shifts = np.moveaxis(shared[:, players], 0, 1)
+    random_shifts = random_shifts * valid[:, np.newaxis, :]
+    random_shifts /= random_shifts.sum(axis=2)[..., np.newaxis]
+    shifted_probabilities = random_shifts - probs[:, np.newaxis, :]
+    shifted_probabilities[np.broadcast_to(~valid[:, np.newaxis, :], shifted_probabilities.shape)] = np.inf
+    return np.argpartition(shifted_probabilities, sample_size, axis=2)[..., :sample_size]
+
+
+def _rank_average(a: np.ndarray, axis: int) -> np.ndarray:
+    """Average ranks along a short axis, as rankdata(method='average')
+
+    Compares every pair along axis, so only use for small axes such as teams in a league.
+
+    Args:
+        a (np.ndarray): the array of values to be ranked
+        axis (int): the axis to rank along
+
+    Returns:
+        np.ndarray of same shape as a
+
+    """
+    a = np.moveaxis(a, axis, -1)[..., np.newaxis]
+    other = np.swapaxes(a, -1, -2)
+    less = (other < a).sum(axis=-1)
+    equal = (other == a).sum(axis=-1)
+    return np.moveaxis(less + (equal + 1) / 2, -1, axis)
+
+
+@_timeit
+def sim_many(pools: Union[Dict[str, Union[PlayerPool, pd.DataFrame]], Iterable[Union[PlayerPool, pd.DataFrame]]],
+             n_iterations: int = 500, 
+             n_teams: int = 10, 
+             n_players: int = 10,
+             statscols: Iterable[str] = ('WFGP', 'FTM', 'FG3M', 'REB', 'AST', 'STL', 'BLK', 'TOV', 'PTS'),
+             probcol: str = 'probs',
+             method: str = 'random',
+             seed: Union[None, int, np.random.Generator] = None,
+             crn: bool = False
+             ) -> Union[Dict[str, pd.DataFrame], List[pd.DataFrame]]:
+    """Simulates NBA fantasy season for several pools at once
+
+    Pools (e.g. seasons or last n games) are stacked along a leading pool axis, 
+    so sampling, team stats, ranking and accumulation run once for all of them.
+
+    Args:
+        pools (Union[Dict, Iterable]): the player pools, as PlayerPool or dataframe
+        n_iterations (int): number of leagues to simulate per pool, default 500
+        n_teams (int): number of teams per league, default 10
+        n_players (int): number of player per team, default 10
+        statscols (Iterable[str]): the stats columns, must be in every pool
+        probcol (str): the column name with probabilities for sampling
+        method (str): league sampling, 'random' (default) or 'stratified'
+        seed (Union[None, int, np.random.Generator]): random seed, default global state,
+            use crn to share draws across pools
+        crn (bool): share random draws for the same player across pools, so differences between
+            pools are less noisy. Players are matched by index label, so pools built from
+            dataframes should be indexed by a player id (e.g. PLAYER_ID); PlayerPool.from_file
+            pools are labelled by row and only match if every file has the same row order.
+
+    Returns:
+        dict or list of pd.DataFrame with columns
+           player[str], pos[str], team[str], pts[float]
+
+    """
+    keys = list(pools) if isinstance(pools, dict) else None
+    pools = [
+        pool if isinstance(pool, PlayerPool) else PlayerPool.from_frame(pool, statscols, probcol)
+        for pool in (pools.values() if keys is not None else pools)
+    ]
+    if not pools:
+        raise ValueError('no pools to simulate')
+    if min(len(pool) for pool in pools) <= n_teams * n_players:
+        raise ValueError('every pool needs more than n_teams * n_players players')
+    stats, probs, valid = _stack_pools(pools, statscols)
+    n_pools, n_max = probs.shape
+
+    # common random numbers are matched by player label, not row
+    players = None
+    if crn:
+        labels = [pool.labels for pool in pools]
+        shared, inverse = np.unique(np.concatenate(labels), return_inverse=True)
+        players = np.zeros((n_pools, n_max), dtype=np.intp)
+        for i, ids in enumerate(np.split(inverse, np.cumsum([len(x) for x in labels])[:-1])):
+            players[i, :len(ids)] = ids
+
+    # teams has shape (n_pools, n_iterations, n_teams * n_players)
+    teams = _stacked_shifting(probs, valid, n_iterations, n_teams * n_players, method, _rng(seed), players)
+
+    # team stats has shape (n_pools, n_iterations, n_teams, len(statscols))
+    pool_idx = np.arange(n_pools)[:, np.newaxis, np.newaxis]
+    team_stats_totals = (
+        stats[pool_idx, teams]
+        .reshape(n_pools, n_iterations, n_teams, n_players, -1)
+        .sum(axis=3)
+    )
+
+    # team_points has shape (n_pools, n_iterations, n_teams)
+    team_points = _rank_average(team_stats_totals, axis=2).sum(axis=3)
+
+    # accumulate team points for each player on the team
+    # flat index is pool * n_max + position, so one bincount covers all pools
+    flat = (teams + pool_idx * n_max).ravel()
+    weights = np.repeat(team_points.ravel(), n_players)
+    totals = np.bincount(flat, weights=weights, minlength=n_pools * n_max)
+    counts = np.bincount(flat, minlength=n_pools * n_max)
+    with np.errstate(invalid='ignore'):
+        player_mean = (totals / counts).reshape(n_pools, n_max)
+
+    results = [_results_frame(pool, pts=player_mean[i, :len(pool)]) for i, pool in enumerate(pools)]
+    return dict(zip(keys, results)) if keys is not None else results
 
 
 if __name__ == '__main__':
@@ -0,0 +1,306 @@
+# nbapr/nbapr/pool.py
+# -*- coding: utf-8 -*-
+# Copyright (C) 2021 Eric Truett
+# Licensed under the MIT License
+
+"""Binary, memory-mappable player pool format
+
+A pool file (``.nbp``) is a single file laid out as follows:
+
+    offset 0    magic bytes b'NBAPR\\x00'
+    offset 6    uint16 format version (little-endian)
+    offset 8    uint32 header length in bytes (little-endian)
+    offset 12   utf-8 JSON header
+    ...         column blocks, each starting on a 64-byte boundary
+
+The JSON header has the shape
+
+    {"n_rows": 208,
+     "columns": [{"name": "PTS", "dtype": "<i8", "offset": 512}, ...]}
+
+Each column is stored as a contiguous little-endian array of ``n_rows`` items.
+Numeric columns keep their numpy dtype and string columns are stored as
+fixed-width unicode (``<U``), so no column ever needs pickle to be read back.
+Object columns holding only numbers are stored as numbers. String columns
+cannot contain missing values; fill them before writing.
+Because columns are independent blocks, a reader can memory-map only the
+columns it needs, e.g. the ``statscols`` and ``probs`` used by ``nbapr.sim``.
+
+"""
+
+import json
+import logging
+import numbers
+from pathlib import Path
+import struct
+from typing import Dict, Iterable, Union
+
+import numpy as np
+
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+MAGIC = b'NBAPR\x00'
+VERSION = 1
+ALIGN = 64
+_PREAMBLE = struct.Struct('<6sHI')
+ID_COLS = {'player': 'PLAYER_NAME', 'pos': 'POS', 'team': 'TEAM'}
+
+
+def _column_array(values) -> np.ndarray:
+    """Converts a column to a little-endian array that does not need pickle
+
+    Args:
+        values (array-like): the column values
+
+    Returns:
+        np.ndarray
+
+    """
+    arr = np.asarray(values)
+    if arr.dtype.kind == 'O':
+        is_str = np.array([isinstance(v, str) for v in arr], dtype=bool)
+        is_num = np.array([isinstance(v, numbers.Number) for v in arr], dtype=bool)
+        if is_num.all():
+            # e.g. numeric columns filled with df.loc[:, c] = pd.to_numeric(...)
+            arr = np.array(arr.tolist())
+        elif is_str.all():
+            arr = arr.astype(str)
+        elif all(v is None or v != v for v in arr[~is_str]):
+            # astype(str) would silently write missing values as 'nan' or 'None'
+            raise ValueError('string columns cannot contain missing values')
+        else:
+            raise ValueError('object columns must hold only strings or only numbers')
+    if arr.dtype.kind not in 'biufU':
+        raise TypeError(f'unsupported column dtype {arr.dtype}')
+    return np.ascontiguousarray(arr, dtype=arr.dtype.newbyteorder('<'))
+
+
+def write_pool(pool, path: Union[str, Path]) -> Path:
+    """Writes player pool to binary pool file
+
+    Args:
+        pool (pd.DataFrame): the player pool dataframe
+        path (Union[str, Path]): the file to write, typically with .nbp suffix
+
+    Returns:
+        Path
+
+    """
+    pth = Path(path)
+    arrays = {str(c): _column_array(pool[c].values) for c in pool.columns}
+
+    # column offsets depend on the header length, which depends on the offsets
+    # so lay out until the header stops growing
+    columns = [{'name': name, 'dtype': arr.dtype.str, 'offset': 0} for name, arr in arrays.items()]
+    header = {'n_rows': len(pool), 'columns': columns}
+    header_bytes = b''
+    while True:
+        offset = _PREAMBLE.size + len(header_bytes)
+        for col in columns:
+            offset += -offset % ALIGN
+            col['offset'] = offset
+            offset += arrays[col['name']].nbytes
+        encoded = json.dumps(header).encode('utf-8')
+        if len(encoded) <= len(header_bytes):
+            header_bytes = encoded.ljust(len(header_bytes))
+            break
+        header_bytes = encoded
+
+    with pth.open('wb') as f:
+        f.write(_PREAMBLE.pack(MAGIC, VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for col in columns:
+            f.write(b'\x00' * (col['offset'] - f.tell()))
+            f.write(arrays[col['name']].tobytes())
+    return pth
+
+
+def read_pool_header(path: Union[str, Path]) -> dict:
+    """Reads the JSON header of a pool file
+
+    Args:
+        path (Union[str, Path]): the pool file
+
+    Returns:
+        dict with keys n_rows[int], columns[list]
+
+    """
+    with Path(path).open('rb') as f:
+        magic, version, header_len = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a pool file')
+        if version > VERSION:
+            raise ValueError(f'unsupported pool file version {version}')
+        return json.loads(f.read(header_len).decode('utf-8'))
+
+
+def read_columns(path: Union[str, Path],
+                 columns: Iterable[str] = None,
+                 mmap: bool = True) -> Dict[str, np.ndarray]:
+    """Reads columns from pool file without touching the others
+
+    Args:
+        path (Union[str, Path]): the pool file
+        columns (Iterable[str]): the columns to read, default all
+        mmap (bool): memory-map the columns rather than reading them into memory
+
+    Returns:
+        Dict[str, np.ndarray]
+
+    """
+    header = read_pool_header(path)
+    n_rows = header['n_rows']
+    layout = {col['name']: col for col in header['columns']}
+    names = list(layout) if columns is None else list(columns)
+    missing = [name for name in names if name not in layout]
+    if missing:
+        raise KeyError(f'columns not in pool file: {missing}')
+
+    arrays = {}
+    with Path(path).open('rb') as f:
+        for name in names:
+            dtype = np.dtype(layout[name]['dtype'])
+            if mmap and n_rows:
+                arrays[name] = np.memmap(f, dtype=dtype, mode='r', offset=layout[name]['offset'], shape=(n_rows,))
+            else:
+                f.seek(layout[name]['offset'])
+                arrays[name] = np.fromfile(f, dtype=dtype, count=n_rows)
+    return arrays
+
+
+def read_pool(path: Union[str, Path], columns: Iterable[str] = None):
+    """Reads player pool from binary pool file
+
+    Args:
+        path (Union[str, Path]): the pool file
+        columns (Iterable[str]): the columns to read, default all
+
+    Returns:
+        pd.DataFrame
+
+    """
+    import pandas as pd
+    return pd.DataFrame(read_columns(path, columns, mmap=False))
+
+
+class PlayerPool:
+    """Array-backed player pool for the simulation hot path
+
+    Built once from a dataframe or pool file, then passed to the simulation
+    stages so they do not re-derive arrays from the dataframe.
+    Row i of ``stats`` and ``probs`` is the player with position i in
+    ``index``, which is always ``np.arange(len(pool))``. The original
+    dataframe index is kept in ``labels`` to align results.
+
+    Attributes:
+        statscols (Tuple[str]): the statistics columns
+        stats (np.ndarray): C-ordered float64 array of shape (n_players, len(statscols))
+        probs (np.ndarray): float64 array of shape (n_players,) with sampling probabilities
+        index (np.ndarray): dense integer index of shape (n_players,)
+        labels (np.ndarray): the original index labels
+        ids (Dict[str, np.ndarray]): player, pos and team columns that are present
+
+    """
+
+    def __init__(self,
+                 stats: np.ndarray,
+                 probs: np.ndarray,
+                 statscols: Iterable[str],
+                 labels: np.ndarray = None,
+                 ids: Dict[str, np.ndarray] = None):
+        self.statscols = tuple(statscols)
+        self.stats = np.ascontiguousarray(stats, dtype=np.float64).reshape(len(probs), len(self.statscols))
+        self.probs = np.ascontiguousarray(probs, dtype=np.float64)
+        self.index = np.arange(len(self.probs))
+        self.labels = self.index if labels is None else np.asarray(labels)
+        self.ids = {k: np.asarray(v) for k, v in (ids or {}).items()}
+        self._validate()
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __repr__(self) -> str:
+        return f'PlayerPool(n_players={len(self)}, statscols={self.statscols})'
+
+    def _validate(self):
+        """Checks arrays are aligned and usable for sampling"""
+        n = len(self.probs)
+        if self.probs.ndim != 1:
+            raise ValueError('probs must be one-dimensional')
+        if len(self.labels) != n or any(len(v) != n for v in self.ids.values()):
+            raise ValueError('pool arrays must have the same length')
+        if not np.isfinite(self.probs).all() or (self.probs < 0).any():
+            raise ValueError('probs must be finite and non-negative')
+
+    @classmethod
+    def from_frame(cls, pool, statscols: Iterable[str] = (), probcol: str = 'probs') -> 'PlayerPool':
+        """Creates PlayerPool from dataframe
+
+        Args:
+            pool (pd.DataFrame): the player pool dataframe
+            statscols (Iterable[str]): the statistics columns
+            probcol (str): the column name with probabilities for sampling
+
+        Returns:
+            PlayerPool
+
+        """
+        statscols = list(statscols)
+        return cls(
+            stats=pool.loc[:, statscols].to_numpy(dtype=np.float64),
+            probs=pool[probcol].to_numpy(dtype=np.float64),
+            statscols=statscols,
+            labels=pool.index.values,
+            ids={k: pool[v].values for k, v in ID_COLS.items() if v in pool.columns}
+        )
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path], statscols: Iterable[str], probcol: str = 'probs') -> 'PlayerPool':
+        """Creates PlayerPool from pool file, reading only the columns it needs
+
+        Args:
+            path (Union[str, Path]): the pool file
+            statscols (Iterable[str]): the statistics columns
+            probcol (str): the column name with probabilities for sampling
+
+        Returns:
+            PlayerPool
+
+        """
+        statscols = list(statscols)
+        available = {col['name'] for col in read_pool_header(path)['columns']}
+        idcols = {k: v for k, v in ID_COLS.items() if v in available}
+        cols = read_columns(path, statscols + [probcol] + list(idcols.values()))
+        stats = np.empty((len(cols[probcol]), len(statscols)), dtype=np.float64)
+        for i, c in enumerate(statscols):
+            stats[:, i] = cols[c]
+        return cls(
+            stats=stats,
+            probs=cols[probcol],
+            statscols=statscols,
+            ids={k: np.array(cols[v]) for k, v in idcols.items()}
+        )
+
+    def columns(self, statscols: Iterable[str]) -> np.ndarray:
+        """Gets stats array for a subset of the statistics columns
+
+        Args:
+            statscols (Iterable[str]): the statistics columns
+
+        Returns:
+            np.ndarray of shape (n_players, len(statscols))
+
+        """
+        statscols = tuple(statscols)
+        if statscols == self.statscols:
+            return self.stats
+        try:
+            idx = [self.statscols.index(c) for c in statscols]
+        except ValueError:
+            raise KeyError(f'statscols not in pool: {statscols}') from None
+        return np.ascontiguousarray(self.stats[:, idx])
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,181 @@
+# nbapr/nbapr/publish.py
+# -*- coding: utf-8 -*-
+# Copyright (C) 2021 Eric Truett
+# Licensed under the MIT License
+
+"""Publishes player rater results as compact, incremental data files
+
+A published file is columnar JSON with numbers rounded to 2 decimals:
+
+    {"columns": ["player", "pos", "team", "pts", "pr_zscore"],
+     "data": [["N Jokic", ...], ["C", ...], ["DEN", ...], [64.28, ...], [19.82, ...]]}
+
+Next to it are a gzip copy (``.json.gz``) for hosts that serve precompressed
+files and a delta file (``.delta.json``) with the rows that changed since the
+previous publish, which is empty when nothing changed. Files whose content
+hash is unchanged are not rewritten.
+
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List, Union
+
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+KEY_COLS = ('player', 'pos', 'team')
+
+
+def _encode(data: dict) -> bytes:
+    """Encodes data as compact JSON"""
+    return json.dumps(data, separators=(',', ':'), allow_nan=False).encode('utf-8')
+
+
+def _digest(b: bytes) -> str:
+    """Gets content hash"""
+    return hashlib.sha256(b).hexdigest()
+
+
+def _write_if_changed(pth: Path, payload: bytes) -> bool:
+    """Writes payload unless the file already has the same content hash"""
+    if pth.is_file() and _digest(pth.read_bytes()) == _digest(payload):
+        return False
+    pth.write_bytes(payload)
+    return True
+
+
+def columnar(results, decimals: int = 2) -> dict:
+    """Converts results dataframe to columnar data
+
+    Args:
+        results (pd.DataFrame): the results, e.g. from nbapr.sim
+        decimals (int): round float columns to this many decimals
+
+    Returns:
+        dict with keys columns[list], data[list], missing values are None
+
+    """
+    data = []
+    for c in results.columns:
+        col = results[c]
+        if col.dtype.kind == 'f':
+            col = col.round(decimals)
+        # NaN is not valid JSON, so write null
+        data.append([None if v != v else v for v in col.tolist()])
+    return {'columns': [str(c) for c in results.columns], 'data': data}
+
+
+def _rows(data: dict) -> Dict[tuple, list]:
+    """Gets rows keyed by player, pos and team from columnar data"""
+    columns = data['columns']
+    keys = [columns.index(c) for c in KEY_COLS if c in columns]
+    return {tuple(row[i] for i in keys): list(row) for row in zip(*data['data'])}
+
+
+def _read_previous(pth: Path, columns: List[str]) -> Union[dict, None]:
+    """Reads previously published file, accepting the legacy row-major format
+
+    Args:
+        pth (Path): the published file
+        columns (List[str]): columns to assume for legacy files
+
+    Returns:
+        dict with keys columns[list], data[list] or None
+
+    """
+    if not pth.is_file():
+        return None
+    try:
+        prev = json.loads(pth.read_text())
+    except ValueError:
+        logging.warning('could not parse %s', pth)
+        return None
+    if 'columns' in prev:
+        return prev
+
+    # legacy files are {'data': rows} with numbers as strings
+    def _num(v):
+        try:
+            return float(v)
+        except (TypeError, ValueError):
+            return v
+
+    rows = [[_num(v) for v in row] for row in prev.get('data', [])]
+    return {'columns': columns, 'data': [list(c) for c in zip(*rows)] or [[] for _ in columns]}
+
+
+def delta(prev: Union[dict, None], data: dict) -> dict:
+    """Gets rows that were added, changed or removed
+
+    Args:
+        prev (dict): previous columnar data, can be None
+        data (dict): current columnar data
+
+    Returns:
+        dict with keys columns[list], changed[list of rows], removed[list of keys]
+
+    """
+    current = _rows(data)
+    previous = _rows(prev) if prev and prev['columns'] == data['columns'] else {}
+    return {
+        'columns': data['columns'],
+        'changed': [row for k, row in current.items() if previous.get(k) != row],
+        'removed': [list(k) for k in previous if k not in current],
+    }
+
+
+def publish(results,
+            pth: Union[str, Path],
+            compress: bool = True,
+            write_delta: bool = True) -> dict:
+    """Writes results if they differ from the published file
+
+    Args:
+        results (pd.DataFrame): the results, e.g. from nbapr.sim
+        pth (Union[str, Path]): the published file, e.g. data/player-rater-9cat.json
+        compress (bool): also write precompressed .json.gz file
+        write_delta (bool): also write .delta.json file with changed rows
+
+    Returns:
+        dict with keys path[Path], written[bool], changed[int], removed[int]
+
+    """
+    pth = Path(pth)
+    data = columnar(results)
+    payload = _encode(data)
+
+    # an unchanged file still gets an empty delta, so old changes are not reported as current
+    d = delta(_read_previous(pth, data['columns']), data)
+    written = _write_if_changed(pth, payload)
+    if not written:
+        logging.info('%s unchanged', pth)
+    if compress:
+        # mtime=0 keeps the compressed bytes stable for identical content
+        _write_if_changed(pth.with_name(pth.name + '.gz'), gzip.compress(payload, mtime=0))
+    if write_delta:
+        _write_if_changed(pth.with_name(pth.stem + '.delta.json'), _encode(d))
+    return {'path': pth, 'written': written, 'changed': len(d['changed']), 'removed': len(d['removed'])}
+
+
+def publish_all(results: Dict[str, object], data_dir: Union[str, Path], **kwargs) -> List[dict]:
+    """Publishes results for several formats
+
+    Args:
+        results (Dict[str, pd.DataFrame]): results keyed by format, e.g. '9cat'
+        data_dir (Union[str, Path]): the directory with player-rater-*.json files
+        **kwargs: keyword arguments for publish
+
+    Returns:
+        List[dict]
+
+    """
+    data_dir = Path(data_dir)
+    return [publish(df, data_dir / f'player-rater-{name}.json', **kwargs) for name, df in results.items()]
+
+
+if __name__ == '__main__':
+    pass
@@ -4,9 +4,12 @@
 # Licensed under the MIT License
 
 import logging
+from pathlib import Path
+from typing import Union
 
 import pandas as pd
-import requests
+
+from .pool import write_pool
 
 
 logging.getLogger(__name__).addHandler(logging.NullHandler())
@@ -37,7 +40,7 @@ def _clean_stats(df: pd.DataFrame) -> pd.DataFrame:
     df['TOV'] = 0 - df['TOV']
 
     # filter columns
-    # need to reset index for sampling to work correctly
+    # reset index so rows are numbered consecutively
     wanted = ['PLAYER_ID', 'PLAYER_NAME', 'TEAM_ABBREVIATION', 'AGE', 'GP',
               'MIN', 'FGM', 'FGA', 'FG_PCT', 'WFGP', 'FG3M', 'FG3A', 'FTM', 'FTA', 
               'FT_PCT', 'WFTP', 'REB', 'AST', 'TOV', 'STL', 'BLK', 'PTS', 'probs']
@@ -111,6 +114,8 @@ def _fetch(season: str, per_mode: str, last_n: int, timeout: float = 3.05) -> pd
         ('Weight', ''),
     )
     
+    import requests
+
     url = 'https://stats.nba.com/stats/leaguedashplayerstats'
     r = requests.get(url, headers=headers, params=params, timeout=timeout)
     r.raise_for_status()
@@ -172,7 +177,7 @@ def _clean_doug(df):
     )
     
     # filter columns
-    # need to reset index for sampling to work correctly
+    # reset index so rows are numbered consecutively
     wanted = ['PLAYER_NAME', 'TEAM', 'POS', 'GP', 'MIN', 'FGM', 'FGA', 
               'FG_PCT', 'WFGP', 'FG3M', 'FG3A', 'FTM', 'FTA', 
               'FT_PCT', 'WFTP', 'REB', 'AST', 'TOV', 'STL', 'BLK', 'PTS', 'probs']
@@ -190,6 +195,8 @@ def _fetch_doug(season):
         pd.DataFrame
 
     """
+    import requests
+
     url = f'http://www.dougstats.com/{season}RD.txt'
     r = requests.get(url)
     lines = r.text.split('\n')
@@ -198,24 +205,29 @@ def _fetch_doug(season):
     return pd.DataFrame(results)
 
 
-def get_stats(season: str, per_mode: str = 'Totals', last_n: int = 0) -> pd.DataFrame:
+def get_stats(season: str,
+              per_mode: str = 'Totals',
+              last_n: int = 0,
+              pool_file: Union[str, Path] = None) -> pd.DataFrame:
     """Fetches stats from NBA stats API.
 
     Args:
         season (str): in YYYY-YY format, default '2020-21'
         per_mode (st): default 'Totals', can be 'Totals', 'PerGame', or 'Per48'
         last_n (int): limit to last_n games, default 0 (all games)
+        pool_file (Union[str, Path]): if specified, also save pool in binary pool format
 
     Returns:
         pd.DataFrame
 
     """
     if len(season) == 7:
-        df = _fetch(season, per_mode, last_n)
-        return _clean_stats(df)
+        df = _clean_stats(_fetch(season, per_mode, last_n))
     else:
-        df = _fetch_doug(season)
-        return _clean_doug(df)
+        df = _clean_doug(_fetch_doug(season))
+    if pool_file:
+        write_pool(df, pool_file)
+    return df
 
 
 if __name__ == '__main__':
@@ -0,0 +1,147 @@
+# nbapr/scripts/bench_import.py
+# -*- coding: utf-8 -*-
+# Copyright (C) 2021 Eric Truett
+# Licensed under the MIT License
+
+from pathlib import Path
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, Iterable, List
+
+import click
+
+
+# modules the simulation path should not load at import time
+LAZY_MODULES = ('pandas', 'requests')
+
+# module imported -> entry point it backs
+TARGETS = {
+    'nbapr': 'library',
+    'nbapr.pool': 'pool files',
+    'scripts.runfbasim': 'sim cli',
+}
+
+# runs the sim cli and reports heavy modules loaded by the end of the run
+CLI_CODE = '''
+import sys
+from scripts.runfbasim import run
+run(['-f', sys.argv[1], '-i', '1'], standalone_mode=False)
+print('EAGER:' + ' '.join(m for m in {lazy} if m in sys.modules))
+'''.format(lazy=LAZY_MODULES)
+
+IMPORTTIME_RE = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def importtime(module: str) -> Dict[str, int]:
+    """Imports module in fresh interpreter with -X importtime
+
+    Args:
+        module (str): the module to import
+
+    Returns:
+        Dict[str, int] of module name to cumulative import time in microseconds
+
+    """
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, check=True
+    )
+    return {m.group(4): int(m.group(2)) for m in IMPORTTIME_RE.finditer(proc.stderr)}
+
+
+def bench(modules: Iterable[str], repeat: int = 5) -> Dict[str, dict]:
+    """Measures best-of-repeat import time and eagerly loaded heavy modules
+
+    Args:
+        modules (Iterable[str]): the modules to import
+        repeat (int): number of fresh interpreters per module
+
+    Returns:
+        Dict[str, dict] with keys ms[float], eager[list]
+
+    """
+    results = {}
+    for module in modules:
+        timings = [importtime(module) for _ in range(repeat)]
+        results[module] = {
+            'ms': min(t[module] for t in timings) / 1000,
+            'eager': [m for m in LAZY_MODULES if m in timings[0]]
+        }
+    return results
+
+
+def cli_run(pool_file: str) -> List[str]:
+    """Runs the sim cli on a pool file in fresh interpreter
+
+    Args:
+        pool_file (str): the .nbp pool file
+
+    Returns:
+        List[str] of heavy modules loaded by the end of the run
+
+    """
+    root = Path(__file__).parent.parent
+    proc = subprocess.run(
+        [sys.executable, '-c', CLI_CODE, str(pool_file)],
+        capture_output=True, text=True, check=True, cwd=root
+    )
+    return proc.stdout.rsplit('EAGER:', 1)[1].split()
+
+
+def bench_cli(pool_file: str = None, repeat: int = 5) -> dict:
+    """Measures best-of-repeat wall time of a full sim cli run
+
+    Args:
+        pool_file (str): the .nbp pool file, default converts tests/pool.csv
+        repeat (int): number of runs
+
+    Returns:
+        dict with keys ms[float], eager[list]
+
+    """
+    if pool_file is None:
+        import pandas as pd
+        from nbapr.pool import write_pool
+        pool = pd.read_csv(Path(__file__).parent.parent / 'tests' / 'pool.csv')
+        pool_file = write_pool(pool, Path(tempfile.mkdtemp()) / 'pool.nbp')
+    timings, eager = [], []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        eager = cli_run(pool_file)
+        timings.append(time.perf_counter() - t)
+    return {'ms': min(timings) * 1000, 'eager': eager}
+
+
+@click.command()
+@click.option('-r', '--repeat', default=5, type=int, help='Number of fresh interpreters per module')
+@click.option('-m', '--max_ms', default=None, type=float, help='Fail if any import takes longer')
+@click.option('-f', '--pool_file', default=None, type=str, help='Pool file (.nbp) for the full cli run')
+def run(repeat, max_ms, pool_file):
+    '''
+    \b
+    python -m scripts.bench_import -r 10 -m 150
+
+    '''
+    failed = False
+    for module, result in bench(TARGETS, repeat).items():
+        eager = ', '.join(result['eager']) or '-'
+        print(f"{module:<20} {TARGETS[module]:<12} {result['ms']:8.1f} ms   eager: {eager}")
+        if result['eager']:
+            failed = True
+        if max_ms is not None and result['ms'] > max_ms:
+            failed = True
+
+    # full run catches pandas or requests loaded at call time, not just import time
+    result = bench_cli(pool_file, repeat)
+    eager = ', '.join(result['eager']) or '-'
+    print(f"{'runfbasim -i 1':<20} {'sim cli run':<12} {result['ms']:8.1f} ms   loaded: {eager}")
+    if result['eager']:
+        failed = True
+    sys.exit(int(failed))
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,132 @@
+# nbapr/scripts/bench_sampling.py
+# -*- coding: utf-8 -*-
+# Copyright (C) 2021 Eric Truett
+# Licensed under the MIT License
+
+import time
+from typing import Iterable
+
+import click
+import numpy as np
+import pandas as pd
+
+from nbapr import PlayerPool, sim_many
+from nbapr.nbapr import SAMPLING_METHODS, compare_players
+
+
+STATSCOLS = ['WFGP', 'FTM', 'FG3M', 'REB', 'AST', 'STL', 'BLK', 'PTS', 'TOV']
+
+
+def bench(pool: PlayerPool, 
+          methods: Iterable[str] = SAMPLING_METHODS,
+          n_iterations: int = 500,
+          n_reps: int = 20,
+          n_teams: int = 10,
+          n_players: int = 10,
+          seed: int = 0) -> pd.DataFrame:
+    """Measures Monte Carlo standard error of pts by sampling method
+
+    Each method runs n_reps independent replications of n_iterations leagues
+    (stacked with sim_many). The standard error of a player's pts is the standard
+    deviation across replications; cpu_s is CPU seconds per replication.
+    se_1s rescales the standard error to one CPU second (se * sqrt(cpu_s)),
+    so lower is better and ratios between methods are efficiency gains.
+
+    Args:
+        pool (PlayerPool): the player pool
+        methods (Iterable[str]): the sampling methods
+        n_iterations (int): leagues per replication
+        n_reps (int): number of replications
+        n_teams (int): number of teams per league
+        n_players (int): number of players per team
+        seed (int): the random seed
+
+    Returns:
+        pd.DataFrame with columns method[str], se[float], cpu_s[float], se_1s[float]
+
+    """
+    rows = []
+    for method in methods:
+        t = time.process_time()
+        results = sim_many([pool] * n_reps, n_iterations=n_iterations, n_teams=n_teams,
+                           n_players=n_players, statscols=pool.statscols, method=method, seed=seed)
+        cpu_s = (time.process_time() - t) / n_reps
+        pts = np.column_stack([r['pts'].values for r in results])
+        pts = pts[np.isfinite(pts).all(axis=1)]
+        se = pts.std(axis=1, ddof=1).mean()
+        rows.append({'method': method, 'se': se, 'cpu_s': cpu_s, 'se_1s': se * np.sqrt(cpu_s)})
+    return pd.DataFrame(rows)
+
+
+def bench_pairs(pool: PlayerPool,
+                n_pairs: int = 10,
+                n_iterations: int = 500,
+                n_reps: int = 20,
+                seed: int = 0) -> pd.DataFrame:
+    """Measures standard error of the difference between adjacent players
+
+    Rows with estimator 'pts difference' measure pts[a] - pts[b] from sim, either
+    from two independent sims ('independent') or from the same sim, so both players
+    are rated in the same leagues ('shared seed').
+    The 'swap effect' row is a different estimator: compare_players swaps the two
+    players inside the same leagues and measures the points a adds over b. Its mean
+    is not pts[a] - pts[b], so its standard error is not a like-for-like reduction.
+
+    Args:
+        pool (PlayerPool): the player pool
+        n_pairs (int): number of adjacent pairs, taken from the top of the rankings
+        n_iterations (int): leagues per replication
+        n_reps (int): number of replications
+        seed (int): the random seed
+
+    Returns:
+        pd.DataFrame with columns estimator[str], method[str], se[float], cpu_s[float], se_1s[float]
+
+    """
+    t = time.process_time()
+    results = sim_many([pool] * n_reps, n_iterations=n_iterations, statscols=pool.statscols, seed=seed)
+    cpu_s = (time.process_time() - t) / n_reps
+    pts = np.column_stack([r['pts'].values for r in results])
+    order = np.argsort(-np.nanmean(pts, axis=1))
+    pairs = list(zip(order[:n_pairs], order[1:n_pairs + 1]))
+
+    # player b from the next replication is independent of player a
+    se = np.mean([np.std(pts[a] - np.roll(pts[b], 1), ddof=1) for a, b in pairs])
+    rows = [{'estimator': 'pts difference', 'method': 'independent', 'se': se, 'cpu_s': 2 * cpu_s}]
+    se = np.mean([np.std(pts[a] - pts[b], ddof=1) for a, b in pairs])
+    rows.append({'estimator': 'pts difference', 'method': 'shared seed', 'se': se, 'cpu_s': cpu_s})
+
+    t = time.process_time()
+    diffs = np.array([
+        [compare_players(pool, pool.labels[a], pool.labels[b], n_iterations=n_iterations,
+                         statscols=pool.statscols, seed=seed + i)['diff'] for i in range(n_reps)]
+        for a, b in pairs
+    ])
+    cpu_s = (time.process_time() - t) / (n_reps * n_pairs)
+    se = diffs.std(axis=1, ddof=1).mean()
+    rows.append({'estimator': 'swap effect', 'method': 'compare_players', 'se': se, 'cpu_s': cpu_s})
+    return pd.DataFrame(rows).assign(se_1s=lambda df: df['se'] * np.sqrt(df['cpu_s']))
+
+
+@click.command()
+@click.option('-f', '--pool_file', type=str, help='Pool file. Can be nbp or csv.')
+@click.option('-i', '--n_iterations', default=500, type=int, help='Number of iterations (leagues) per replication')
+@click.option('-r', '--n_reps', default=20, type=int, help='Number of replications')
+def run(pool_file, n_iterations, n_reps):
+    '''
+    \b
+    python -m scripts.bench_sampling -f tests/pool.csv -i 500 -r 20
+
+    '''
+    if pool_file.endswith('.nbp'):
+        pool = PlayerPool.from_file(pool_file, STATSCOLS)
+    else:
+        pool = PlayerPool.from_frame(pd.read_csv(pool_file), STATSCOLS)
+    print('standard error of pts')
+    print(bench(pool, n_iterations=n_iterations, n_reps=n_reps).to_string(index=False))
+    print('\nstandard error of difference between adjacent players (swap effect is a different estimator)')
+    print(bench_pairs(pool, n_iterations=n_iterations, n_reps=n_reps).to_string(index=False))
+
+
+if __name__ == '__main__':
+    run()
@@ -8,9 +8,9 @@ import logging
 import sys
 
 import click
-import pandas as pd
+import numpy as np
 from nbapr import sim
-from nbapr.stats import _clean_stats
+from nbapr.pool import PlayerPool
 
 
 EIGHT_CAT_STATS = ['WFGP', 'WFTP', 'FG3M', 'REB', 'AST', 'STL', 'BLK', 'PTS']
@@ -19,7 +19,7 @@ NINE_CAT_ALT_STATS = ['WFGP', 'FTM', 'FG3M', 'REB', 'AST', 'STL', 'BLK', 'PTS',
 
 
 @click.command()
-@click.option('-f', '--pool_file', type=str, help='Pool file. Can be csv or pickle.')
+@click.option('-f', '--pool_file', type=str, help='Pool file. Can be nbp or csv.')
 @click.option('-i', '--n_iterations', default=500, type=int, help='Number of iterations (leagues)')
 @click.option('-n', '--n_teams', default=10, type=int, help='Number of teams in league')
 @click.option('-p', '--n_players', default=10, type=int, help='Number of players on team')
@@ -39,10 +39,13 @@ def run(pool_file, n_iterations, n_teams, n_players, league_type):
         statscols = NINE_CAT_ALT_STATS
     
     # load datafile
-    try:
+    # binary pool files only read the columns the sim uses and never import pandas
+    if pool_file.endswith('.nbp'):
+        pool = PlayerPool.from_file(pool_file, statscols)
+    else:
+        import pandas as pd
         pool = pd.read_csv(pool_file)
-    except:
-        pool = pd.read_pickle(pool_file)        
+    as_frame = not isinstance(pool, PlayerPool)
 
     # run sim with specified parameters
     results = sim(
@@ -50,10 +53,36 @@ def run(pool_file, n_iterations, n_teams, n_players, league_type):
         n_iterations=n_iterations, 
         n_teams=n_teams, 
         n_players=n_players, 
-        statscols=statscols
+        statscols=statscols,
+        as_frame=as_frame
     )
     
-    print(results.sort_values('pts'), ascending=False)
+    # print every row so both paths give the same table to shell pipelines
+    if as_frame:
+        print(results.sort_values('pts', ascending=False).to_string())
+    else:
+        _print_results(results)
+
+
+def _print_results(results):
+    """Prints dict of result arrays sorted by pts in the same layout as DataFrame.to_string"""
+    order = np.argsort(-results['pts'], kind='stable')
+    cells = {'': [str(i) for i in order]}
+    for c, values in results.items():
+        if values.dtype.kind == 'f':
+            cells[c] = [' NaN' if np.isnan(values[i]) else f'{values[i]: .6f}' for i in order]
+        else:
+            cells[c] = [str(values[i]) for i in order]
+    widths = {c: max([len(c)] + [len(v) for v in col]) for c, col in cells.items()}
+
+    # index is left-aligned and followed by two spaces, columns are right-aligned and separated by a space
+    def _line(row):
+        index, *values = zip(cells, row)
+        return index[1].ljust(widths['']) + ' ' + ''.join(' ' + v.rjust(widths[c]) for c, v in values)
+
+    print(_line(list(cells)))
+    for row in zip(*cells.values()):
+        print(_line(row))
 
 
 if __name__ == '__main__':
@@ -3,32 +3,45 @@
 # Copyright (C) 2021 Eric Truett
 # Licensed under the MIT License
 
-import json
 from pathlib import Path
 
 from nbapr import sim, pr_traditional
+from nbapr.publish import publish_all
 from nbapr.stats import get_stats
 
 
-def run():
-    """Runs update script"""
-    
-    mapping = {
-      '8cat': ['WFGP', 'WFTP', 'FG3M', 'REB', 'AST', 'STL', 'BLK', 'PTS'],
-      '9cat': ['WFGP', 'WFTP', 'FG3M', 'REB', 'AST', 'STL', 'BLK', 'PTS', 'TOV'],
-      '9catftm': ['WFGP', 'FTM', 'FG3M', 'REB', 'AST', 'STL', 'BLK', 'PTS', 'TOV']
-    }
+MAPPING = {
+  '8cat': ['WFGP', 'WFTP', 'FG3M', 'REB', 'AST', 'STL', 'BLK', 'PTS'],
+  '9cat': ['WFGP', 'WFTP', 'FG3M', 'REB', 'AST', 'STL', 'BLK', 'PTS', 'TOV'],
+  '9catftm': ['WFGP', 'FTM', 'FG3M', 'REB', 'AST', 'STL', 'BLK', 'PTS', 'TOV']
+}
 
-    pool = get_stats(season='20-21')        
+# fixed seed so unchanged stats give identical ratings and files are not rewritten
+SEED = 0
+
+
+def rate(pool, seed: int = SEED) -> dict:
+    """Rates pool for every format
+
+    Args:
+        pool (pd.DataFrame): the player pool dataframe
+        seed (int): the sim seed
+
+    Returns:
+        Dict[str, pd.DataFrame] keyed by format
+
+    """
     cols = ['player', 'pos', 'team']
+    published = {}
 
-    for catname, catstats in mapping.items():
+    for catname, catstats in MAPPING.items():
         results = sim(
             pool=pool,
             n_iterations=500, 
             n_teams=10, 
             n_players=12,
-            statscols=catstats
+            statscols=catstats,
+            seed=seed
         )
 
         # add traditional player rater
@@ -36,23 +49,23 @@ def run():
             results
             .join(pr_traditional(pool).set_index(cols), how='left', on=cols)
             .dropna()
-            .sort_values('pts', ascending=False)
+            .sort_values('pts', ascending=False, kind='stable')
         )
 
-        # address rounding issue
-        results.loc[:, 'pts'] = results.loc[:, 'pts'].round(2).astype(str)
-        results.loc[:, 'pr_zscore'] = results.loc[:, 'pr_zscore'].round(2).astype(str)
-
         # fix names
         names = results['player'].str.split(',', expand=True)
         results.loc[:, 'player'] = names[1].str[0].str.upper() + ' ' + names[0].str.title()
+        published[catname] = results.dropna()
+    return published
+
 
-        # save to disk
-        pth = Path(__file__).parent.parent / 'data' / f'player-rater-{catname}.json'
-        with pth.open('w') as f:
-            data = {'data': results.dropna().values.tolist()}
-            json.dump(data, f)
+def run():
+    """Runs update script"""
+    pool = get_stats(season='20-21')        
 
+    # save to disk, skipping files that have not changed
+    for result in publish_all(rate(pool), Path(__file__).parent.parent / 'data'):
+        print(f"{result['path'].name}: written={result['written']} changed={result['changed']} removed={result['removed']}")
 
 if __name__ == '__main__':
     run()
@@ -11,14 +11,27 @@ import pandas as pd
 import pytest
 
 sys.path.append("../nbapr")
+from nbapr.pool import write_pool
 from nbapr.stats import _clean_stats
 
 
-@pytest.fixture
-def pool(test_directory):
+@pytest.fixture(scope="session")
+def _pool(test_directory):
+    """Parses pool.csv once per session"""
     return pd.read_csv(test_directory / 'pool.csv')
 
 
+@pytest.fixture
+def pool(_pool):
+    return _pool.copy()
+
+
+@pytest.fixture(scope="session")
+def pool_file(_pool, tmp_path_factory):
+    """Writes pool.csv in binary pool format"""
+    return write_pool(_pool, tmp_path_factory.mktemp('pool') / 'pool.nbp')
+
+
 @pytest.fixture(scope="session", autouse=True)
 def root_directory(request):
     """Gets root directory"""
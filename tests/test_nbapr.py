@@ -3,10 +3,16 @@
 # Copyright (C) 2021 Eric Truett
 # Licensed under the MIT License
 
+import subprocess
+import sys
+
 import numpy as np
 import pytest
 
-from nbapr.nbapr import _create_teams, _create_teamstats
+from nbapr.nbapr import (_create_player_points, _create_teams, _create_teamstats,
+                         _rank_average, _stacked_shifting, _uniforms, compare_players,
+                         pr_traditional, pr_traditional_sweep, rankdata, sim, sim_many)
+from nbapr.pool import PlayerPool
 
 
 def test_create_teams(pool, tprint):
@@ -23,19 +29,24 @@ def test_create_teamstats(pool):
     assert isinstance(ts, np.ndarray)
 
 
-@pytest.mark.skip
-def test_create_player_points(clean_pool):
-    """
-    (
-        pool: pd.DataFrame, 
-        teams: np.ndarray,
-        n_iterations: int,
-        n_teams: int,
-        n_players: int,
-        team_points: np.ndarray
-    ) -> np.ndarray:
-    """
-    teams = _create_teams(clean_pool)
+def test_create_teamstats_player_pool(pool):
+    """Tests _create_teamstats with PlayerPool matches dataframe"""
+    statscols = ('WFGP', 'FTM', 'FG3M', 'REB', 'AST', 'STL', 'BLK', 'PTS', 'TOV')
+    pp = PlayerPool.from_frame(pool, statscols)
+    teams = _create_teams(pp)
+    assert teams.max() < len(pp)
+    assert np.allclose(_create_teamstats(pp, statscols, teams), _create_teamstats(pool, statscols, teams))
+
+
+def test_create_player_points(pool):
+    """Tests _create_player_points"""
+    pp = PlayerPool.from_frame(pool.set_index('PLAYER_ID'), ('PTS',))
+    teams = _create_teams(pp, n_iterations=5, n_teams=4, n_players=3)
+    team_points = np.arange(20, dtype=float).reshape(5, 4) + 1
+    player_points = _create_player_points(pp, teams, 5, 4, 3, team_points)
+    assert player_points.shape == (20, len(pp))
+    assert (np.count_nonzero(player_points, axis=1) == 3).all()
+    assert player_points[0, teams[0, 0, 0]] == 1
 
 
 @pytest.mark.skip
@@ -50,3 +61,143 @@ def test_sim():
         ) -> pd.DataFrame:
     """
     assert True
+
+
+def test_rank_average():
+    """Tests _rank_average matches rankdata"""
+    a = np.random.randint(0, 3, size=(4, 5, 10, 9)).astype(float)
+    assert np.allclose(_rank_average(a, axis=2), rankdata(a, method='average', axis=2))
+
+
+def test_stacked_shifting():
+    """Tests _stacked_shifting never samples padding"""
+    valid = np.ones((2, 50), dtype=bool)
+    valid[1, 30:] = False
+    probs = np.where(valid, 1 / valid.sum(axis=1, keepdims=True), 0)
+    teams = _stacked_shifting(probs, valid, 100, 20)
+    assert teams.shape == (2, 100, 20)
+    assert teams[1].max() < 30
+    assert all(len(set(league)) == 20 for league in teams[1])
+
+
+def test_sim_many(pool):
+    """Tests sim_many matches sim for a single pool and handles mixed sizes"""
+    statscols = ('WFGP', 'FTM', 'FG3M', 'REB', 'AST', 'STL', 'BLK', 'PTS', 'TOV')
+    np.random.seed(0)
+    expected = sim(pool, n_iterations=50, statscols=statscols)
+    np.random.seed(0)
+    result = sim_many([pool], n_iterations=50, statscols=statscols)[0]
+    assert np.allclose(result['pts'], expected['pts'], equal_nan=True)
+
+    results = sim_many({'all': pool, 'half': pool.iloc[::2]}, n_iterations=50, statscols=statscols)
+    assert list(results) == ['all', 'half']
+    assert len(results['half']) == len(pool.iloc[::2])
+    assert results['half'].index.equals(pool.iloc[::2].index)
+    with pytest.raises(ValueError):
+        sim_many([pool.iloc[:100]], n_iterations=5, statscols=statscols)
+    with pytest.raises(ValueError, match='no pools'):
+        sim_many({}, n_iterations=5, statscols=statscols)
+
+
+def test_stacked_shifting_players():
+    """Tests _stacked_shifting shares draws by player, not row"""
+    probs = np.full((2, 150), 1 / 150)
+    valid = np.ones((2, 150), dtype=bool)
+    players = np.stack([np.arange(150), np.arange(150)[::-1]])
+    teams = _stacked_shifting(probs, valid, 10, 100, rng=np.random.default_rng(0), players=players)
+    assert all(set(a) == set(149 - b) for a, b in zip(teams[0], teams[1]))
+
+
+def test_sim_many_crn(pool):
+    """Tests sim_many with crn matches players across differently ordered pools"""
+    statscols = ('WFGP', 'FTM', 'FG3M', 'REB', 'AST', 'STL', 'BLK', 'PTS', 'TOV')
+    pool = pool.set_index('PLAYER_ID')
+    a, b = sim_many([pool, pool.iloc[::-1]], n_iterations=20, statscols=statscols, seed=0, crn=True)
+    assert np.allclose(a['pts'], b.loc[a.index, 'pts'], equal_nan=True)
+
+
+def test_uniforms():
+    """Tests _uniforms sampling methods"""
+    rng = np.random.default_rng(0)
+    u = _uniforms((100, 5), 'stratified', rng)
+    assert all(sorted(col) == list(range(100)) for col in np.floor(u * 100).astype(int).T)
+    assert _uniforms((2, 7, 5), 'stratified', rng).shape == (2, 7, 5)
+    for method in ('sobol', 'antithetic'):
+        with pytest.raises(ValueError):
+            _uniforms((10, 5), method, rng)
+
+
+@pytest.mark.parametrize('method', ['random', 'stratified'])
+def test_sim_method(pool, method):
+    """Tests sim with variance reduction is reproducible with seed"""
+    statscols = ('WFGP', 'FTM', 'FG3M', 'REB', 'AST', 'STL', 'BLK', 'PTS', 'TOV')
+    a = sim(pool, n_iterations=20, statscols=statscols, method=method, seed=1)
+    b = sim(pool, n_iterations=20, statscols=statscols, method=method, seed=1)
+    assert np.allclose(a['pts'], b['pts'], equal_nan=True)
+
+
+def test_compare_players(pool):
+    """Tests compare_players is antisymmetric with common random numbers"""
+    statscols = ('WFGP', 'FTM', 'FG3M', 'REB', 'AST', 'STL', 'BLK', 'PTS', 'TOV')
+    ab = compare_players(pool, 0, 1, n_iterations=50, statscols=statscols, seed=2)
+    ba = compare_players(pool, 1, 0, n_iterations=50, statscols=statscols, seed=2)
+    assert ab['n_leagues'] > 0 and ab['se'] > 0
+    assert np.isclose(ab['diff'], -ba['diff'])
+    assert compare_players(pool, 0, 0, n_iterations=10, statscols=statscols)['diff'] == 0
+    with pytest.raises(KeyError):
+        compare_players(pool, 0, 'XXX', n_iterations=10, statscols=statscols)
+
+
+def test_pr_traditional_sweep(pool):
+    """Tests pr_traditional_sweep matches pr_traditional on filtered pools"""
+    pool = pool.rename(columns={'TEAM_ABBREVIATION': 'TEAM'}).assign(POS='F')
+    sweep = pr_traditional_sweep(pool, cutoffs={'MIN': [0, 500], 'GP': [15]}, top_n={'PTS': [50]})
+    pools = {
+        'pr_zscore_MIN_0': pool,
+        'pr_zscore_MIN_500': pool.loc[pool.MIN >= 500],
+        'pr_zscore_GP_15': pool.loc[pool.GP >= 15],
+        'pr_zscore_top50_PTS': pool.nlargest(50, 'PTS', keep='first'),
+    }
+    for col, df in pools.items():
+        expected = pr_traditional(df)
+        assert sweep[col].notna().sum() == len(expected)
+        assert np.allclose(sweep.loc[expected.index, col], expected['pr_zscore'])
+
+
+def test_pr_traditional_sweep_dropna(pool):
+    """Tests pr_traditional_sweep ranks top n among complete rows"""
+    pool = pool.rename(columns={'TEAM_ABBREVIATION': 'TEAM'}).assign(POS='F')
+    pool.loc[pool['PTS'].idxmax(), 'AST'] = np.nan
+    sweep = pr_traditional_sweep(pool, top_n={'PTS': [10]})
+    expected = pr_traditional(pool.dropna().nlargest(10, 'PTS', keep='first'))
+    assert sweep['pr_zscore_top10_PTS'].notna().sum() == 10
+    assert np.allclose(sweep.loc[expected.index, 'pr_zscore_top10_PTS'], expected['pr_zscore'])
+
+
+def _imported(module):
+    """Gets heavy modules loaded by importing module in fresh interpreter"""
+    code = f'import sys, {module}; print(" ".join(m for m in ("pandas", "requests") if m in sys.modules))'
+    return subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout.split()
+
+
+def test_import_is_lazy():
+    """Tests simulation path does not load pandas or requests at import"""
+    assert _imported('nbapr') == []
+    assert _imported('nbapr.stats') == ['pandas']
+
+
+def test_cli_run_is_lazy(pool_file):
+    """Tests a full sim cli run on a pool file does not load pandas or requests"""
+    from scripts.bench_import import cli_run
+    assert cli_run(pool_file) == []
+
+
+def test_print_results(pool_file, capsys):
+    """Tests cli prints .nbp results in the same layout as the dataframe"""
+    from scripts.runfbasim import _print_results
+    statscols = ('WFGP', 'FTM', 'FG3M', 'REB', 'AST', 'STL', 'BLK', 'PTS', 'TOV')
+    pp = PlayerPool.from_file(pool_file, statscols)
+    expected = sim(pp, n_iterations=20, statscols=statscols, seed=0)
+    _print_results(sim(pp, n_iterations=20, statscols=statscols, seed=0, as_frame=False))
+    frame = expected.sort_values('pts', ascending=False, kind='stable').to_string()
+    assert capsys.readouterr().out.splitlines()[:5] == frame.splitlines()[:5]
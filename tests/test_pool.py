@@ -0,0 +1,93 @@
+# nbapr/tests/test_pool.py
+# -*- coding: utf-8 -*-
+# Copyright (C) 2021 Eric Truett
+# Licensed under the MIT License
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from nbapr.pool import PlayerPool, read_columns, read_pool, read_pool_header, write_pool
+
+
+def test_read_pool_header(pool, pool_file):
+    """Tests read_pool_header"""
+    header = read_pool_header(pool_file)
+    assert header['n_rows'] == len(pool)
+    assert [col['name'] for col in header['columns']] == list(pool.columns)
+    assert all(col['offset'] % 64 == 0 for col in header['columns'])
+
+
+def test_read_pool(pool, pool_file):
+    """Tests read_pool roundtrip"""
+    df = read_pool(pool_file)
+    pd.testing.assert_frame_equal(df, pool, check_dtype=False)
+
+
+def test_read_columns(pool, pool_file):
+    """Tests read_columns only reads requested columns"""
+    cols = read_columns(pool_file, columns=['PTS', 'probs'])
+    assert list(cols) == ['PTS', 'probs']
+    assert isinstance(cols['probs'], np.memmap)
+    assert np.array_equal(cols['probs'], pool['probs'].values)
+    with pytest.raises(KeyError):
+        read_columns(pool_file, columns=['XXX'])
+
+
+def test_read_pool_invalid(tmp_path):
+    """Tests read_pool_header rejects other files"""
+    pth = tmp_path / 'pool.csv'
+    pth.write_text('a,b,c\n1,2,3\n')
+    with pytest.raises(ValueError):
+        read_pool_header(pth)
+
+
+def test_player_pool_from_frame(pool):
+    """Tests PlayerPool.from_frame"""
+    statscols = ('PTS', 'REB')
+    pp = PlayerPool.from_frame(pool.set_index('PLAYER_ID'), statscols)
+    assert len(pp) == len(pool)
+    assert pp.stats.flags['C_CONTIGUOUS']
+    assert np.array_equal(pp.index, np.arange(len(pool)))
+    assert np.array_equal(pp.labels, pool['PLAYER_ID'].values)
+    assert np.array_equal(pp.columns(['REB']).ravel(), pool['REB'].values)
+    assert 'player' in pp.ids
+    with pytest.raises(KeyError):
+        pp.columns(['AST'])
+
+
+def test_player_pool_from_file(pool, pool_file):
+    """Tests PlayerPool.from_file"""
+    pp = PlayerPool.from_file(pool_file, ('PTS', 'REB'))
+    assert np.array_equal(pp.stats, pool.loc[:, ['PTS', 'REB']].values)
+    assert np.array_equal(pp.probs, pool['probs'].values)
+
+
+def test_player_pool_invalid(pool):
+    """Tests PlayerPool rejects bad probabilities"""
+    with pytest.raises(ValueError):
+        PlayerPool.from_frame(pool.assign(probs=-1.0))
+
+
+def test_write_pool_missing_strings(pool, tmp_path):
+    """Tests write_pool rejects missing values in string columns"""
+    pool.loc[0, 'PLAYER_NAME'] = None
+    with pytest.raises(ValueError):
+        write_pool(pool, tmp_path / 'pool.nbp')
+
+
+def test_write_pool_object_columns(pool, tmp_path):
+    """Tests write_pool stores object columns of numbers as numbers"""
+    pool['PTS'] = pool['PTS'].astype(object)
+    pool['FG_PCT'] = pool['FG_PCT'].astype(object)
+    df = read_pool(write_pool(pool, tmp_path / 'pool.nbp'), columns=['PTS', 'FG_PCT'])
+    assert df['PTS'].dtype.kind == 'i' and df['FG_PCT'].dtype.kind == 'f'
+    assert np.array_equal(df['PTS'].values, pool['PTS'].values.astype(int))
+
+
+def test_write_pool_mixed_objects(pool, tmp_path):
+    """Tests write_pool rejects object columns mixing strings and numbers"""
+    pool['PLAYER_NAME'] = pool['PLAYER_NAME'].astype(object)
+    pool.loc[0, 'PLAYER_NAME'] = 3
+    with pytest.raises(ValueError, match='only strings or only numbers'):
+        write_pool(pool, tmp_path / 'pool.nbp')
@@ -0,0 +1,83 @@
+# nbapr/tests/test_publish.py
+# -*- coding: utf-8 -*-
+# Copyright (C) 2021 Eric Truett
+# Licensed under the MIT License
+
+import gzip
+import json
+
+import pandas as pd
+import pytest
+
+from nbapr.publish import columnar, delta, publish, publish_all
+
+
+@pytest.fixture
+def results():
+    return pd.DataFrame({
+        'player': ['N Jokic', 'D Lillard', 'L Doncic'],
+        'pos': ['C', 'PG', 'SG'],
+        'team': ['DEN', 'POR', 'DAL'],
+        'pts': [64.2800001, 63.35, 63.27],
+        'pr_zscore': [19.82, 17.4, 16.13]
+    })
+
+
+def test_columnar(results):
+    """Tests columnar"""
+    data = columnar(results)
+    assert data['columns'] == list(results.columns)
+    assert data['data'][3] == [64.28, 63.35, 63.27]
+
+
+def test_delta(results):
+    """Tests delta"""
+    prev = columnar(results)
+    changed = results.assign(pts=[64.28, 63.35, 60.0]).iloc[1:]
+    d = delta(prev, columnar(changed))
+    assert d['changed'] == [['L Doncic', 'SG', 'DAL', 60.0, 16.13]]
+    assert d['removed'] == [['N Jokic', 'C', 'DEN']]
+    assert len(delta(None, prev)['changed']) == 3
+
+
+def test_publish(results, tmp_path):
+    """Tests publish skips unchanged files"""
+    pth = tmp_path / 'player-rater-9cat.json'
+    assert publish(results, pth)['written']
+    assert json.loads(gzip.decompress((tmp_path / 'player-rater-9cat.json.gz').read_bytes())) == columnar(results)
+    delta_pth = tmp_path / 'player-rater-9cat.delta.json'
+    gz_pth = tmp_path / 'player-rater-9cat.json.gz'
+    gz_pth.unlink()
+    assert not publish(results, pth)['written']
+    assert gz_pth.is_file()
+    assert json.loads(delta_pth.read_text())['changed'] == []
+    result = publish(results.assign(pr_zscore=0.0), pth)
+    assert result['written'] and result['changed'] == 3
+
+
+def test_publish_legacy(results, tmp_path):
+    """Tests publish computes delta against legacy row-major files"""
+    pth = tmp_path / 'player-rater-9cat.json'
+    rows = results.round(2).astype(str).values.tolist()
+    pth.write_text(json.dumps({'data': rows}))
+    assert publish(results, pth)['changed'] == 0
+
+
+def test_columnar_nan(results, tmp_path):
+    """Tests missing ratings are published as null"""
+    results.loc[0, 'pts'] = float('nan')
+    assert columnar(results)['data'][3][0] is None
+    pth = publish(results, tmp_path / 'player-rater-9cat.json')['path']
+    assert json.loads(pth.read_text())['data'][3][0] is None
+
+
+def test_rate_publish_unchanged(pool, tmp_path):
+    """Tests publishing the same stats twice does not rewrite files"""
+    from scripts.update_datafiles import rate
+    names = pool['PLAYER_NAME'].str.split(' ', n=1, expand=True)
+    pool = pool.assign(PLAYER_NAME=names[1] + ', ' + names[0], POS='F').rename(columns={'TEAM_ABBREVIATION': 'TEAM'})
+    first = publish_all(rate(pool), tmp_path)
+    assert all(result['written'] for result in first)
+    for result in publish_all(rate(pool), tmp_path):
+        assert result['written'] is False
+        assert result['changed'] == 0